@@ -9,13 +9,19 @@ import psycopg2
 import threading
 import time
 
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from psycopg2.extras import RealDictCursor
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse, urlsplit
+from urllib.robotparser import RobotFileParser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 print("### BLOG LEAD CRAWLER API v1.3.6 — LONG-LIVED WORKER (LOCAL/VPS ONLY) ###")
@@ -26,9 +32,13 @@ print("### BLOG LEAD CRAWLER API v1.3.6 — LONG-LIVED WORKER (LOCAL/VPS ONLY) #
 RUN_WORKER = os.getenv("RUN_WORKER", "true").lower() == "true"
 
 # =========================================================
-# APP INIT (UNCHANGED)
+# APP INIT (orjson RESPONSES)
 # =========================================================
-app = FastAPI(title="Blog Lead Crawler API", version="1.3.6")
+app = FastAPI(
+    title="Blog Lead Crawler API",
+    version="1.3.6",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,26 +49,76 @@ app.add_middleware(
 )
 
 # =========================================================
-# DATABASE (SAFE RETRY — UNCHANGED)
+# DATABASE (POOLED + SAFE RETRY)
 # =========================================================
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL not set")
 
-def get_conn(retries=3, delay=2):
-    last_error = None
-    for _ in range(retries):
-        try:
-            return psycopg2.connect(
+# psycopg2's pool only keeps a returned connection while it holds fewer
+# than minconn idle ones, so minconn must be >= 1 for any reuse at all.
+# It is built on first use: minconn connections are opened up front and
+# importing this module should not need the database.
+DB_POOL_MIN = max(1, int(os.getenv("DB_POOL_MIN", "1")))
+DB_POOL_MAX = max(DB_POOL_MIN, int(os.getenv("DB_POOL_MAX", "10")))
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def db_pool() -> ThreadedConnectionPool:
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = ThreadedConnectionPool(
+                DB_POOL_MIN,
+                DB_POOL_MAX,
                 DATABASE_URL,
                 cursor_factory=RealDictCursor,
                 sslmode="require",
                 connect_timeout=5
             )
+        return _db_pool
+
+def is_alive(conn) -> bool:
+    # conn.closed only flips after a failed operation, so an idle
+    # connection the server or a load balancer dropped still looks open.
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+@contextmanager
+def get_conn(retries=3, delay=2):
+    conn = None
+    pool = None
+    last_error = None
+    for _ in range(retries):
+        try:
+            pool = db_pool()
+            conn = pool.getconn()
+            if is_alive(conn):
+                break
+            # Stale pooled connection: drop it and take another straight away
+            pool.putconn(conn, close=True)
+            conn = None
+            last_error = "stale pooled connection"
         except Exception as e:
             last_error = e
             time.sleep(delay)
-    raise RuntimeError(f"Database unavailable: {last_error}")
+    if conn is None:
+        raise RuntimeError(f"Database unavailable: {last_error}")
+
+    try:
+        # Same commit-on-success / rollback-on-error as `with psycopg2.connect()`.
+        with conn:
+            yield conn
+    finally:
+        # A connection the server dropped is closed, not kept for reuse
+        pool.putconn(conn, close=bool(conn.closed))
 
 DB_LOCK = threading.Lock()
 
@@ -88,7 +148,8 @@ def classify_anchor(anchor_text: str, domain: str) -> str:
     if text in GENERIC_ANCHORS:
         return "generic"
 
-    if domain and domain.lower() in text:
+    # domain comes from extract_domain(), which already lowercases it
+    if domain and domain in text:
         return "branded"
 
     if text.startswith("http") or "." in text:
@@ -141,55 +202,249 @@ def crawl_blog(req: CrawlRequest):
                         INSERT INTO blog_pages (blog_url, is_root, crawl_status)
                         VALUES (%s, TRUE, 'pending')
                         ON CONFLICT (blog_url) DO NOTHING
+                        RETURNING id
                     """, (blog_url,))
+                    row = cur.fetchone()
+                    if not row:
+                        cur.execute("SELECT id FROM blog_pages WHERE blog_url = %s", (blog_url,))
+                        row = cur.fetchone()
                     conn.commit()
 
-        return {"status": "queued", "blog_url": blog_url}
+        invalidate_history()
+        return {"status": "queued", "blog_url": blog_url, "job_id": row["id"] if row else None}
 
     except Exception as e:
         return {"status": "error", "reason": "database_unavailable", "detail": str(e)}
 
 # =========================================================
-# HISTORY (UNCHANGED)
+# 🆕 JOB STATUS — POLL A QUEUED /crawl
+# =========================================================
+@app.get("/jobs/{job_id}")
+def job_status(job_id: int):
+    with DB_LOCK:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT id AS job_id, blog_url, crawl_status, first_crawled
+                    FROM blog_pages
+                    WHERE id = %s
+                      AND is_root = TRUE
+                """, (job_id,))
+                job = cur.fetchone()
+
+    if not job:
+        return {"status": "error", "reason": "job_not_found", "job_id": job_id}
+    return job
+
+# =========================================================
+# HISTORY (SHORT TTL CACHE)
 # =========================================================
+# Dashboards poll this; the 30-day window barely moves between polls.
+# /crawl invalidates it so a newly queued blog shows up immediately.
+HISTORY_TTL = float(os.getenv("HISTORY_TTL", "30"))
+# "generation" is bumped on every invalidation; a query that started
+# before a /crawl insert must not store its (older) body afterwards.
+_history_cache = {"body": None, "expires": 0.0, "generation": 0}
+_history_lock = threading.Lock()
+
+def invalidate_history():
+    with _history_lock:
+        _history_cache["body"] = None
+        _history_cache["generation"] += 1
+
 @app.get("/history")
 def history():
+    with _history_lock:
+        if _history_cache["body"] is not None and time.monotonic() < _history_cache["expires"]:
+            return Response(content=_history_cache["body"], media_type="application/json")
+        generation = _history_cache["generation"]
+
+    # Postgres builds the JSON array itself; ::text stops psycopg2 from
+    # decoding it back into dicts just to have them re-encoded.
     with DB_LOCK:
         with get_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
-                    SELECT blog_url, first_crawled, crawl_status
-                    FROM blog_pages
-                    WHERE first_crawled >= NOW() - INTERVAL '30 days'
-                    ORDER BY first_crawled DESC
+                    SELECT COALESCE(json_agg(t ORDER BY t.first_crawled DESC), '[]'::json)::text AS body
+                    FROM (
+                        SELECT blog_url, first_crawled, crawl_status
+                        FROM blog_pages
+                        WHERE first_crawled >= NOW() - INTERVAL '30 days'
+                    ) t
                 """)
-                return cur.fetchall()
+                body = cur.fetchone()["body"]
+
+    with _history_lock:
+        if _history_cache["generation"] == generation:
+            _history_cache["body"] = body
+            _history_cache["expires"] = time.monotonic() + HISTORY_TTL
+    return Response(content=body, media_type="application/json")
 
 # =========================================================
-# DOMAIN NORMALIZATION (UNCHANGED)
+# DOMAIN NORMALIZATION (MEMOIZED)
 # =========================================================
+@lru_cache(maxsize=65536)
 def extract_domain(url: str) -> str:
-    url = url.replace("https://", "").replace("http://", "")
-    if url.startswith("www."):
-        url = url[4:]
-    return url.split("/")[0].strip()
-
-# =========================================================
-# SAFE FETCH (UNCHANGED)
-# =========================================================
-def safe_fetch(url: str):
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/121.0.0.0 Safari/537.36"
-        )
-    }
+    return urlsplit(url).netloc.strip().lower().removeprefix("www.")
+
+# =========================================================
+# SAFE FETCH — SHARED KEEP-ALIVE SESSION
+# =========================================================
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
+    )
+}
+
+session = requests.Session()
+session.headers.update(HEADERS)
+
+_adapter = HTTPAdapter(
+    pool_connections=50,
+    pool_maxsize=100,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    ),
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# Only <a href> subtrees are ever read, so skip building the rest of the DOM.
+ONLY_LINKS = SoupStrainer("a", href=True)
+
+# Per-host spacing: each host gets at most one request per CRAWL_DELAY
+# seconds, no matter how many worker threads are running.
+CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "1.5"))
+_last_hit = {}
+_last_hit_lock = threading.Lock()
+_LAST_HIT_PRUNE_AT = 1024
+
+def wait_for_host(host: str):
+    with _last_hit_lock:
+        now = time.monotonic()
+        # Hosts whose slot is already in the past carry no spacing state
+        if len(_last_hit) >= _LAST_HIT_PRUNE_AT:
+            for h in [h for h, t in _last_hit.items() if t + CRAWL_DELAY <= now]:
+                del _last_hit[h]
+        slot = max(now, _last_hit.get(host, 0) + CRAWL_DELAY)
+        _last_hit[host] = slot
+    if slot > now:
+        time.sleep(slot - now)
+
+def safe_fetch(url: str, **kwargs):
     try:
-        return requests.get(url, headers=headers, timeout=15)
+        wait_for_host(urlparse(url).netloc)
+        return session.get(url, timeout=15, **kwargs)
     except Exception:
         return None
 
+# Check headers before pulling the body: PDFs, images, video and huge
+# pages are dropped without downloading them.
+MAX_PAGE_BYTES = 2_000_000
+
+def fetch_html(url: str):
+    resp = safe_fetch(url, stream=True)
+    if resp is None:
+        return None
+
+    with resp:
+        if resp.status_code != 200:
+            return None
+
+        content_type = resp.headers.get("content-type", "").lower()
+        if content_type and "html" not in content_type:
+            return None
+
+        # Oversized pages are rejected whether or not the server sends a
+        # Content-Length (chunked / gzip responses are checked as they stream).
+        length = safe_text(lambda: int(resp.headers.get("content-length") or 0), 0)
+        if length > MAX_PAGE_BYTES:
+            print(f"⚠️ Skipping {url}: Content-Length {length} > {MAX_PAGE_BYTES} bytes")
+            return None
+
+        body = bytearray()
+        try:
+            for chunk in resp.iter_content(65536):
+                body += chunk
+                if len(body) > MAX_PAGE_BYTES:
+                    print(f"⚠️ Skipping {url}: body exceeds {MAX_PAGE_BYTES} bytes")
+                    return None
+        except Exception:
+            return None
+        return bytes(body)
+
+# =========================================================
+# 🤖 ROBOTS.TXT (CACHED PER ORIGIN, WITH TTL)
+# =========================================================
+# Parsed rules are re-read after ROBOTS_TTL seconds so a long-running
+# worker picks up changes. A robots.txt that could not be fetched (no
+# response, or a 5xx) means "assume complete disallow" (RFC 9309); that
+# outcome is never cached, so the next attempt fetches it again.
+ROBOTS_TTL = float(os.getenv("ROBOTS_TTL", "86400"))
+_robots_cache = {}
+_robots_lock = threading.Lock()
+_ROBOTS_CACHE_MAX = 2048
+
+class RobotsUnavailable(Exception):
+    """robots.txt could not be read; retry the blog later instead of failing it."""
+
+def robots_for(origin: str) -> RobotFileParser:
+    now = time.monotonic()
+    with _robots_lock:
+        cached = _robots_cache.get(origin)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    rp = RobotFileParser()
+    resp = safe_fetch(f"{origin}/robots.txt")
+    if resp is None or resp.status_code >= 500:
+        raise RobotsUnavailable("robots_txt_unreachable")
+
+    if resp.status_code == 200:
+        rp.parse(resp.text.splitlines())
+    elif resp.status_code in (401, 403):
+        rp.disallow_all = True
+    else:
+        rp.allow_all = True
+
+    with _robots_lock:
+        if len(_robots_cache) >= _ROBOTS_CACHE_MAX:
+            for o in [o for o, (expires, _) in _robots_cache.items() if expires <= now]:
+                del _robots_cache[o]
+            if len(_robots_cache) >= _ROBOTS_CACHE_MAX:
+                _robots_cache.clear()
+        _robots_cache[origin] = (now + ROBOTS_TTL, rp)
+    return rp
+
+def is_allowed(url: str) -> bool:
+    p = urlparse(url)
+    return robots_for(f"{p.scheme}://{p.netloc}").can_fetch(HEADERS["User-Agent"], url)
+
+# =========================================================
+# ⏳ RETRY BACKOFF (IN-PROCESS)
+# =========================================================
+# Blogs whose robots.txt was unreachable go back to 'pending' but are
+# left out of the claim query until ROBOTS_RETRY_AFTER has passed.
+ROBOTS_RETRY_AFTER = float(os.getenv("ROBOTS_RETRY_AFTER", "300"))
+_backoff = {}
+_backoff_lock = threading.Lock()
+
+def back_off(blog_id: int):
+    with _backoff_lock:
+        _backoff[blog_id] = time.monotonic() + ROBOTS_RETRY_AFTER
+
+def backed_off_ids() -> list:
+    now = time.monotonic()
+    with _backoff_lock:
+        for blog_id in [b for b, t in _backoff.items() if t <= now]:
+            del _backoff[blog_id]
+        return list(_backoff)
+
 # =========================================================
 # 🔁 CORE CRAWLER — ZERO-ERROR HARDENED (MINIMAL CHANGE)
 # =========================================================
@@ -197,66 +452,84 @@ def crawler_worker_single():
     with DB_LOCK:
         with get_conn() as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, blog_url
-                    FROM blog_pages
-                    WHERE is_root = TRUE
-                      AND crawl_status = 'pending'
-                    ORDER BY first_crawled ASC
-                    LIMIT 1
-                """)
-                blog = cur.fetchone()
-                if not blog:
-                    return None
-
+                # Claim + mark in one statement so parallel workers
+                # (threads or processes) never pick the same blog.
                 cur.execute("""
                     UPDATE blog_pages
                     SET crawl_status = 'in_progress'
-                    WHERE id = %s
-                """, (blog["id"],))
+                    WHERE id = (
+                        SELECT id
+                        FROM blog_pages
+                        WHERE is_root = TRUE
+                          AND crawl_status = 'pending'
+                          AND NOT (id = ANY(%s::bigint[]))
+                        ORDER BY first_crawled ASC
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, blog_url
+                """, (backed_off_ids(),))
+                blog = cur.fetchone()
                 conn.commit()
+                if not blog:
+                    return None
 
     blog_id = blog["id"]
     blog_url = blog["blog_url"]
     print(f"🔍 Crawling blog: {blog_url}")
 
     try:
-        resp = safe_fetch(blog_url)
-        if not resp or resp.status_code != 200:
+        if not is_allowed(blog_url):
+            raise Exception("disallowed_by_robots_txt")
+
+        body = fetch_html(blog_url)
+        if body is None:
             raise Exception("request_failed")
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(body, "lxml", parse_only=ONLY_LINKS)
         links = soup.find_all("a", href=True) or []
 
-        with DB_LOCK:
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    for a in links:
-                        href = safe_text(lambda: a.get("href").strip())
-                        if not href or href.startswith("#"):
-                            continue
+        # Parse everything first (no lock held), then write in one batch.
+        rows = []
+        seen = set()
+        for a in links:
+            href = safe_text(lambda: a.get("href").strip())
+            if not href or href.startswith("#"):
+                continue
 
-                        full_url = safe_text(lambda: urljoin(blog_url, href))
-                        domain = safe_text(lambda: extract_domain(full_url))
-                        anchor = safe_text(lambda: a.get_text(strip=True), "")[:255]
+            full_url = safe_text(lambda: urljoin(blog_url, href))
+            if not full_url or full_url in seen:
+                continue
+            seen.add(full_url)
 
-                        if not full_url or not domain:
-                            continue
+            domain = safe_text(lambda: extract_domain(full_url))
+            if not domain:
+                continue
 
-                        anchor_type = classify_anchor(anchor, domain)
+            anchor = safe_text(lambda: a.get_text(strip=True), "")[:255]
 
-                        cur.execute("""
-                            INSERT INTO outbound_links
-                            (blog_page_id, url, commercial_domain, anchor_text, anchor_type, is_dofollow)
-                            VALUES (%s, %s, %s, %s, %s, TRUE)
-                            ON CONFLICT DO NOTHING
-                        """, (blog_id, full_url, domain, anchor, anchor_type))
+            anchor_type = classify_anchor(anchor, domain)
+            rows.append((blog_id, full_url, domain, anchor, anchor_type))
 
-                        cur.execute("""
-                            INSERT INTO commercial_sites (commercial_domain)
-                            VALUES (%s)
-                            ON CONFLICT (commercial_domain) DO NOTHING
-                        """, (domain,))
+        with DB_LOCK:
+            with get_conn() as conn:
+                with conn.cursor() as cur:
+                    inserted = execute_values(cur, """
+                        INSERT INTO outbound_links
+                        (blog_page_id, url, commercial_domain, anchor_text, anchor_type, is_dofollow)
+                        VALUES %s
+                        ON CONFLICT DO NOTHING
+                        RETURNING commercial_domain
+                    """, rows, template="(%s, %s, %s, %s, %s, TRUE)", page_size=500, fetch=True)
+
+                    # Links that already existed were saved together with their
+                    # commercial_sites row, so only new links can add domains.
+                    domains = sorted({r["commercial_domain"] for r in inserted})
+                    execute_values(cur, """
+                        INSERT INTO commercial_sites (commercial_domain)
+                        VALUES %s
+                        ON CONFLICT (commercial_domain) DO NOTHING
+                    """, [(d,) for d in domains], page_size=500)
 
                     cur.execute("""
                         UPDATE blog_pages
@@ -265,6 +538,22 @@ def crawler_worker_single():
                     """, (blog_id,))
                     conn.commit()
 
+        print(f"✅ Crawled blog: {blog_url} ({len(inserted)} new links)")
+
+    except RobotsUnavailable as e:
+        # Transient: hand the blog back and skip it for a while
+        back_off(blog_id)
+        with DB_LOCK:
+            with get_conn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE blog_pages
+                        SET crawl_status = 'pending'
+                        WHERE id = %s
+                    """, (blog_id,))
+                    conn.commit()
+        print(f"⏳ Deferred blog {blog_url}: {e}")
+
     except Exception as e:
         with DB_LOCK:
             with get_conn() as conn:
@@ -277,18 +566,34 @@ def crawler_worker_single():
                     conn.commit()
         print(f"❌ Failed blog {blog_url}: {e}")
 
+    return blog_id
+
 # =========================================================
-# ♾️ WORKER LOOP (UNCHANGED)
+# ♾️ WORKER LOOP — N PARALLEL CRAWLER THREADS
 # =========================================================
+# Fetching is network-bound, so several threads overlap the HTTP waits;
+# DB writes stay serialized behind DB_LOCK.
+CRAWL_WORKERS = max(1, int(os.getenv("CRAWL_WORKERS", "4")))
+
 def crawler_worker():
-    print("### LONG-LIVED CRAWLER WORKER STARTED ###")
+    print(f"### LONG-LIVED CRAWLER WORKER STARTED ({threading.current_thread().name}) ###")
     while True:
-        job = crawler_worker_single()
+        try:
+            job = crawler_worker_single()
+        except Exception as e:
+            # e.g. a pooled connection dropped by the server; keep the thread alive
+            print("❌ Crawler worker error:", e)
+            time.sleep(5)
+            continue
         if not job:
             time.sleep(10)
 
+def start_crawler_workers():
+    for i in range(CRAWL_WORKERS):
+        threading.Thread(target=crawler_worker, name=f"crawler-{i}", daemon=False).start()
+
 if RUN_WORKER:
-    threading.Thread(target=crawler_worker, daemon=False).start()
+    start_crawler_workers()
 
 # =========================================================
 # 📤 EXPORTS
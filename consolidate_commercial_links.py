@@ -1,6 +1,11 @@
 import mysql.connector
+from functools import lru_cache
 from urllib.parse import urlparse
 
+@lru_cache(maxsize=100_000)
+def url_domain(url):
+    return urlparse(url).netloc.replace("www.", "")
+
 connection = mysql.connector.connect(
     host="localhost",
     user="root",
@@ -8,7 +13,8 @@ connection = mysql.connector.connect(
     database="blog_lead_crawler"
 )
 
-cursor = connection.cursor(dictionary=True)
+# Plain unbuffered cursor: tuple rows stream in, never all held in memory
+cursor = connection.cursor()
 
 # Fetch all commercial links
 cursor.execute("""
@@ -16,17 +22,10 @@ SELECT commercial_url, is_dofollow
 FROM commercial_links
 """)
 
-rows = cursor.fetchall()
-
-if not rows:
-    print("❌ No commercial links found")
-    exit()
-
 summary = {}
 
-for row in rows:
-    domain = urlparse(row["commercial_url"]).netloc.replace("www.", "")
-    is_dofollow = row["is_dofollow"]
+for commercial_url, is_dofollow in cursor:
+    domain = url_domain(commercial_url)
 
     if domain not in summary:
         summary[domain] = {
@@ -41,6 +40,10 @@ for row in rows:
     else:
         summary[domain]["nofollow"] += 1
 
+if not summary:
+    print("❌ No commercial links found")
+    exit()
+
 print("\n📌 Consolidated Commercial Links Report:\n")
 
 for domain, data in summary.items():
@@ -1,7 +1,7 @@
 import requests
 import mysql.connector
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlsplit
 from datetime import datetime
 
 # ---------------- CONFIG ----------------
@@ -41,16 +41,16 @@ except Exception as e:
     print("❌ Failed to fetch homepage:", e)
     exit()
 
-soup = BeautifulSoup(response.text, "html.parser")
+soup = BeautifulSoup(response.content, "lxml")
 
 # ---------------- EXTRACT INTERNAL LINKS ----------------
-base_netloc = urlparse(blog_url).netloc
-internal_pages = set()
+base_netloc = urlsplit(blog_url).netloc
+internal_pages = {}  # dict as an ordered set: keeps homepage link order
 
 for a in soup.find_all("a", href=True):
     href = a["href"].strip()
     full_url = urljoin(blog_url, href)
-    parsed = urlparse(full_url)
+    parsed = urlsplit(full_url)
 
     # Only internal URLs
     if parsed.netloc != base_netloc:
@@ -61,29 +61,33 @@ for a in soup.find_all("a", href=True):
         continue
 
     clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}"
-    internal_pages.add(clean_url)
+    internal_pages.setdefault(clean_url)
 
 print(f"📄 Found {len(internal_pages)} internal pages")
 
 # ---------------- INSERT INTO DB ----------------
-inserted = 0
 today = datetime.now().date()
 
-for page_url in internal_pages:
-    cursor.execute("""
-        SELECT id FROM blog_pages 
-        WHERE blog_id = %s AND page_url = %s
-    """, (blog_id, page_url))
-
-    if cursor.fetchone():
-        continue
-
-    cursor.execute("""
+# Existing pages for this blog in one query, then one multi-row INSERT
+cursor.execute("""
+    SELECT page_url FROM blog_pages
+    WHERE blog_id = %s
+""", (blog_id,))
+existing = {row["page_url"] for row in cursor.fetchall()}
+
+new_rows = [
+    (blog_id, page_url, today)
+    for page_url in internal_pages
+    if page_url not in existing
+]
+
+if new_rows:
+    cursor.executemany("""
         INSERT INTO blog_pages (blog_id, page_url, post_date)
         VALUES (%s, %s, %s)
-    """, (blog_id, page_url, today))
+    """, new_rows)
 
-    inserted += 1
+inserted = len(new_rows)
 
 connection.commit()
 
@@ -1,7 +1,7 @@
 import requests
 import mysql.connector
 from bs4 import BeautifulSoup
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlsplit, urljoin
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (BlogLeadCrawler/1.0)"
@@ -14,6 +14,10 @@ DB_CONFIG = {
     "database": "blog_lead_crawler"
 }
 
+# Pages of one blog share a host, so the session reuses that connection
+session = requests.Session()
+session.headers.update(HEADERS)
+
 conn = mysql.connector.connect(**DB_CONFIG)
 cursor = conn.cursor(dictionary=True)
 
@@ -31,33 +35,36 @@ inserted = 0
 for row in pages:
     blog_id = row["blog_id"]
     page_url = row["page_url"]
-    blog_domain = urlparse(row["blog_url"]).netloc
+    blog_domain = urlsplit(row["blog_url"]).netloc
 
     try:
-        r = requests.get(page_url, headers=HEADERS, timeout=15)
+        r = session.get(page_url, timeout=15)
         if r.status_code != 200:
             continue
     except:
         continue
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(r.content, "lxml")
+
+    # Links already stored for this page: one query instead of one per anchor
+    cursor.execute("""
+        SELECT outbound_url FROM page_outbound_links
+        WHERE page_url=%s
+    """, (page_url,))
+    seen = {link["outbound_url"] for link in cursor.fetchall()}
 
     for a in soup.find_all("a", href=True):
         full_url = urljoin(page_url, a["href"])
-        parsed = urlparse(full_url)
+        parsed = urlsplit(full_url)
 
         if not parsed.netloc or parsed.netloc == blog_domain:
             continue
 
         clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
 
-        cursor.execute("""
-            SELECT id FROM page_outbound_links
-            WHERE page_url=%s AND outbound_url=%s
-        """, (page_url, clean_url))
-
-        if cursor.fetchone():
+        if clean_url in seen:
             continue
+        seen.add(clean_url)
 
         cursor.execute("""
             INSERT INTO page_outbound_links (blog_id, page_url, outbound_url)
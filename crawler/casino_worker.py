@@ -1,9 +1,15 @@
+import re
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import requests
 import psycopg2
-from bs4 import BeautifulSoup
-from psycopg2.extras import RealDictCursor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +18,10 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL not set")
 
+# Domains claimed per DB round-trip / homepages fetched in parallel
+ENRICH_BATCH = max(1, int(os.getenv("ENRICH_BATCH", "16")))
+ENRICH_WORKERS = max(1, int(os.getenv("ENRICH_WORKERS", "8")))
+
 CASINO_KEYWORDS = [
     "casino",
     "gambling",
@@ -24,36 +34,105 @@ CASINO_KEYWORDS = [
     "sports betting",
 ]
 
+# One precompiled alternation: a single C-level scan instead of a
+# Python loop over every keyword.
+CASINO_RE = re.compile("|".join(map(re.escape, CASINO_KEYWORDS)), re.IGNORECASE)
+
+# Only <title> and <meta> are read; don't build the page body at all.
+HEAD_TAGS = SoupStrainer(["title", "meta"])
+MAX_HEAD_BYTES = 1_000_000
+
+# Reused connections: no TLS + auth handshake per batch. minconn=1 is
+# what makes putconn keep a connection (with 0 it closes every one);
+# the pool is created on first use so importing this opens nothing.
+_db_pool = None
+
+def db_pool():
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ThreadedConnectionPool(
+            1,
+            2,
+            DATABASE_URL,
+            cursor_factory=RealDictCursor,
+            sslmode="require",
+        )
+    return _db_pool
+
+def is_alive(conn) -> bool:
+    # An idle connection dropped by the server still reports closed == 0
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+@contextmanager
 def get_conn():
-    return psycopg2.connect(
-        DATABASE_URL,
-        cursor_factory=RealDictCursor,
-        sslmode="require",
+    pool = db_pool()
+    conn = pool.getconn()
+    if not is_alive(conn):
+        pool.putconn(conn, close=True)
+        conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        # A connection the server dropped is closed, not handed out again
+        pool.putconn(conn, close=bool(conn.closed))
+
+# Keep-alive session; the pool is sized so every fetch thread gets a
+# connection instead of "Connection pool is full, discarding connection"
+session = requests.Session()
+session.headers.update({
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
     )
+})
+_adapter = HTTPAdapter(
+    pool_connections=ENRICH_WORKERS * 2,
+    pool_maxsize=ENRICH_WORKERS,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    ),
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
 
 def is_casino_content(text: str) -> bool:
-    text = (text or "").lower()
-    return any(keyword in text for keyword in CASINO_KEYWORDS)
+    return CASINO_RE.search(text or "") is not None
 
 def enrich_domain(domain: str):
     url = f"https://{domain}"
 
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/121.0.0.0 Safari/537.36"
-        )
-    }
-
     try:
-        response = requests.get(url, headers=headers, timeout=15)
-        if response.status_code != 200:
-            return None
+        with session.get(url, timeout=15, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            content_type = response.headers.get("content-type", "").lower()
+            if content_type and "html" not in content_type:
+                return None
+
+            # <title>/<meta> live at the top of the page: never pull more
+            # than MAX_HEAD_BYTES, however large the homepage is.
+            body = bytearray()
+            for chunk in response.iter_content(65536):
+                body += chunk
+                if len(body) >= MAX_HEAD_BYTES:
+                    break
     except Exception:
         return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(bytes(body[:MAX_HEAD_BYTES]), "lxml", parse_only=HEAD_TAGS)
 
     title = soup.title.string.strip() if soup.title else ""
     description = ""
@@ -71,72 +150,75 @@ def enrich_domain(domain: str):
         "is_casino": casino_flag,
     }
 
+def safe_enrich(domain: str):
+    # One bad homepage must not fail (and endlessly retry) the whole batch
+    try:
+        return enrich_domain(domain)
+    except Exception:
+        return None
+
 def casino_worker():
-    print("🎰 Casino enrichment worker started")
-
-    while True:
-        try:
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        SELECT commercial_domain
-                        FROM commercial_sites
-                        WHERE meta_title IS NULL
-                        LIMIT 1
-                        """
-                    )
-                    row = cur.fetchone()
-
-            if not row:
-                time.sleep(10)
-                continue
-
-            domain = row["commercial_domain"]
-            print(f"🔍 Enriching casino data for: {domain}")
-
-            result = enrich_domain(domain)
-
-            if not result:
+    print(f"🎰 Casino enrichment worker started ({ENRICH_WORKERS} fetch threads)")
+
+    with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as pool:
+        while True:
+            try:
                 with get_conn() as conn:
                     with conn.cursor() as cur:
                         cur.execute(
                             """
-                            UPDATE commercial_sites
-                            SET meta_title = '',
-                                meta_description = '',
-                                is_casino = FALSE
-                            WHERE commercial_domain = %s
+                            SELECT commercial_domain
+                            FROM commercial_sites
+                            WHERE meta_title IS NULL
+                            LIMIT %s
+                            """,
+                            (ENRICH_BATCH,),
+                        )
+                        rows = cur.fetchall()
+
+                if not rows:
+                    time.sleep(10)
+                    continue
+
+                domains = [row["commercial_domain"] for row in rows]
+                print(f"🔍 Enriching casino data for {len(domains)} domains")
+
+                # Homepage fetches are network-bound: run the batch concurrently
+                updates = []
+                for domain, result in zip(domains, pool.map(safe_enrich, domains)):
+                    if not result:
+                        updates.append((domain, "", "", False))
+                        continue
+                    updates.append((
+                        domain,
+                        result["meta_title"],
+                        result["meta_description"],
+                        result["is_casino"],
+                    ))
+
+                # Whole batch in one statement / one commit
+                with get_conn() as conn:
+                    with conn.cursor() as cur:
+                        execute_values(
+                            cur,
+                            """
+                            UPDATE commercial_sites AS cs
+                            SET meta_title = v.meta_title,
+                                meta_description = v.meta_description,
+                                is_casino = v.is_casino
+                            FROM (VALUES %s) AS v (commercial_domain, meta_title, meta_description, is_casino)
+                            WHERE cs.commercial_domain = v.commercial_domain
                             """,
-                            (domain,),
+                            updates,
                         )
                         conn.commit()
-                continue
-
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        UPDATE commercial_sites
-                        SET meta_title = %s,
-                            meta_description = %s,
-                            is_casino = %s
-                        WHERE commercial_domain = %s
-                        """,
-                        (
-                            result["meta_title"],
-                            result["meta_description"],
-                            result["is_casino"],
-                            domain,
-                        ),
-                    )
-                    conn.commit()
-
-            print(f"✅ Enriched {domain} | casino={result['is_casino']}")
-
-        except Exception as e:
-            print("❌ Casino worker error:", e)
-            time.sleep(5)
+
+                for domain, _, _, is_casino in updates:
+                    print(f"✅ Enriched {domain} | casino={is_casino}")
+
+            except Exception as e:
+                print("❌ Casino worker error:", e)
+                time.sleep(5)
 
 if __name__ == "__main__":
     casino_worker()
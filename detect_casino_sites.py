@@ -1,3 +1,4 @@
+import re
 import requests
 import mysql.connector
 from bs4 import BeautifulSoup
@@ -9,6 +10,15 @@ CASINO_KEYWORDS = [
     "sportsbook", "wager", "odds", "bonus", "free spins"
 ]
 
+# Single-pass prefilter; most sites match nothing and skip the per-keyword loop
+CASINO_RE = re.compile("|".join(map(re.escape, CASINO_KEYWORDS)))
+
+# Analyses newer than this are reused; older ones are re-fetched
+RECHECK_AFTER_DAYS = 30
+
+# One keep-alive session for all homepage checks
+session = requests.Session()
+
 connection = mysql.connector.connect(
     host="localhost",
     user="root",
@@ -26,15 +36,29 @@ FROM commercial_links
 
 urls = cursor.fetchall()
 
-print(f"🔍 Checking {len(urls)} commercial sites for casino content")
-
+# commercial_site_analysis doubles as the cache: skip domains checked recently
+cursor.execute("""
+SELECT commercial_domain
+FROM commercial_site_analysis
+WHERE checked_at > NOW() - INTERVAL %s DAY
+""", (RECHECK_AFTER_DAYS,))
+analysed = {row["commercial_domain"] for row in cursor.fetchall()}
+
+# Many URLs share one domain: fetch each homepage once
+domains = {}
 for row in urls:
     domain = urlparse(row["commercial_url"]).netloc.replace("www.", "")
+    if domain not in analysed:
+        domains[domain] = None
+
+print(f"🔍 Checking {len(domains)} commercial sites for casino content")
+
+for domain in domains:
     homepage = f"https://{domain}"
 
     try:
-        r = requests.get(homepage, timeout=10)
-        soup = BeautifulSoup(r.text, "html.parser")
+        r = session.get(homepage, timeout=10)
+        soup = BeautifulSoup(r.content, "lxml")
     except Exception:
         continue
 
@@ -49,7 +73,7 @@ for row in urls:
     body_text = soup.get_text(" ", strip=True).lower()
     text += body_text[:3000]  # limit size
 
-    matched = [k for k in CASINO_KEYWORDS if k in text]
+    matched = [k for k in CASINO_KEYWORDS if k in text] if CASINO_RE.search(text) else []
     is_casino = 1 if matched else 0
 
     cursor.execute("""
@@ -58,7 +82,8 @@ for row in urls:
         VALUES (%s, %s, %s)
         ON DUPLICATE KEY UPDATE
             is_casino = VALUES(is_casino),
-            matched_keywords = VALUES(matched_keywords)
+            matched_keywords = VALUES(matched_keywords),
+            checked_at = CURRENT_TIMESTAMP
     """, (domain, is_casino, ", ".join(matched)))
 
     print(f"{domain} → {'CASINO' if is_casino else 'NON-CASINO'}")
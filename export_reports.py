@@ -1,7 +1,13 @@
 import csv
 import mysql.connector
+from functools import lru_cache
 from urllib.parse import urlparse
 
+# Output 2 still groups in Python; outputs 1 and 3 use DOMAIN_SQL below
+@lru_cache(maxsize=100_000)
+def url_domain(url):
+    return urlparse(url).netloc.replace("www.", "")
+
 connection = mysql.connector.connect(
     host="localhost",
     user="root",
@@ -11,34 +17,43 @@ connection = mysql.connector.connect(
 
 cursor = connection.cursor(dictionary=True)
 
+# 1 MB file buffer: far fewer write syscalls than the 8 kB default
+CSV_BUFFER = 1024 * 1024
+
+# SQL twin of urlparse(commercial_url).netloc.replace("www.", "")
+DOMAIN_SQL = """
+REPLACE(
+    SUBSTRING_INDEX(SUBSTRING_INDEX(
+        SUBSTRING_INDEX(SUBSTRING_INDEX(cl.commercial_url, '/', 3), '/', -1),
+    '?', 1), '#', 1),
+'www.', '')
+"""
+
 # =========================
 # OUTPUT FILE 1
 # Page-level commercial links
 # =========================
-cursor.execute("""
+# Plain tuple cursor: rows go straight into csv.writer.writerows
+# (no per-row dict, no per-column lookups); the label is built in SQL.
+row_cursor = connection.cursor()
+row_cursor.execute("""
 SELECT
     b.domain AS blog_domain,
     bp.page_url,
     cl.commercial_url,
-    cl.is_dofollow
+    CASE WHEN cl.is_dofollow THEN 'dofollow' ELSE 'nofollow' END AS is_dofollow
 FROM commercial_links cl
 JOIN blog_pages bp ON cl.page_id = bp.id
 JOIN blogs b ON bp.blog_id = b.id
 """)
 
-rows = cursor.fetchall()
-
-with open("output_1_page_level_links.csv", "w", newline="", encoding="utf-8") as f:
+with open("output_1_page_level_links.csv", "w", newline="", encoding="utf-8", buffering=CSV_BUFFER) as f:
     writer = csv.writer(f)
     writer.writerow(["blog_domain", "page_url", "commercial_url", "is_dofollow"])
+    # Unbuffered cursor: rows stream from MySQL into the file, never all in RAM
+    writer.writerows(row_cursor)
 
-    for r in rows:
-        writer.writerow([
-            r["blog_domain"],
-            r["page_url"],
-            r["commercial_url"],
-            "dofollow" if r["is_dofollow"] else "nofollow"
-        ])
+row_cursor.close()
 
 print("✅ Output 1 generated")
 
@@ -46,25 +61,28 @@ print("✅ Output 1 generated")
 # OUTPUT FILE 2
 # Consolidated commercial sites
 # =========================
-cursor.execute("""
+# Tuple rows streamed off an unbuffered cursor: no per-row dict, no fetchall
+row_cursor = connection.cursor()
+row_cursor.execute("""
 SELECT commercial_url, is_dofollow
 FROM commercial_links
 """)
 
-rows = cursor.fetchall()
 summary = {}
 
-for r in rows:
-    domain = urlparse(r["commercial_url"]).netloc.replace("www.", "")
+for commercial_url, is_dofollow in row_cursor:
+    domain = url_domain(commercial_url)
 
     if domain not in summary:
         summary[domain] = {"total": 0, "dofollow": 0}
 
     summary[domain]["total"] += 1
-    if r["is_dofollow"]:
+    if is_dofollow:
         summary[domain]["dofollow"] += 1
 
-with open("output_2_consolidated_commercial_sites.csv", "w", newline="", encoding="utf-8") as f:
+row_cursor.close()
+
+with open("output_2_consolidated_commercial_sites.csv", "w", newline="", encoding="utf-8", buffering=CSV_BUFFER) as f:
     writer = csv.writer(f)
     writer.writerow(["commercial_domain", "total_links", "dofollow_percent", "nofollow_percent"])
 
@@ -79,36 +97,20 @@ print("✅ Output 2 generated")
 # OUTPUT FILE 3
 # Blog-level summary
 # =========================
-cursor.execute("""
+# Aggregated in MySQL: one row per blog comes back instead of every link.
+cursor.execute(f"""
 SELECT
     b.blog_url,
-    cl.commercial_url,
-    cl.is_dofollow
+    COUNT(DISTINCT CAST({DOMAIN_SQL} AS BINARY)) AS unique_domains,
+    COUNT(*) AS total,
+    COALESCE(SUM(cl.is_dofollow <> 0), 0) AS dofollow
 FROM commercial_links cl
 JOIN blog_pages bp ON cl.page_id = bp.id
 JOIN blogs b ON bp.blog_id = b.id
+GROUP BY b.blog_url
 """)
 
-rows = cursor.fetchall()
-blogs = {}
-
-for r in rows:
-    blog = r["blog_url"]
-    domain = urlparse(r["commercial_url"]).netloc.replace("www.", "")
-
-    if blog not in blogs:
-        blogs[blog] = {
-            "domains": set(),
-            "total": 0,
-            "dofollow": 0
-        }
-
-    blogs[blog]["domains"].add(domain)
-    blogs[blog]["total"] += 1
-    if r["is_dofollow"]:
-        blogs[blog]["dofollow"] += 1
-
-with open("output_3_blog_summary.csv", "w", newline="", encoding="utf-8") as f:
+with open("output_3_blog_summary.csv", "w", newline="", encoding="utf-8", buffering=CSV_BUFFER) as f:
     writer = csv.writer(f)
     writer.writerow([
         "blog_url",
@@ -117,11 +119,12 @@ with open("output_3_blog_summary.csv", "w", newline="", encoding="utf-8") as f:
         "casino_related"
     ])
 
-    for blog, data in blogs.items():
-        dofollow_pct = round((data["dofollow"] / data["total"]) * 100, 2)
+    # Stream straight off the cursor into the file, like outputs 1 and 2
+    for r in cursor:
+        dofollow_pct = round((int(r["dofollow"]) / r["total"]) * 100, 2)
         writer.writerow([
-            blog,
-            len(data["domains"]),
+            r["blog_url"],
+            r["unique_domains"],
             dofollow_pct,
             "unknown"
         ])
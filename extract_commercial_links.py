@@ -1,7 +1,9 @@
 import requests
 import mysql.connector
 from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
+
+session = requests.Session()
 
 connection = mysql.connector.connect(
     host="localhost",
@@ -30,11 +32,11 @@ print(f"🔍 Scanning {len(pages)} pages for commercial links")
 for page in pages:
     page_id = page["page_id"]
     page_url = page["page_url"]
-    blog_domain = urlparse(page["blog_url"]).netloc
+    blog_domain = urlsplit(page["blog_url"]).netloc
 
     try:
-        r = requests.get(page_url, timeout=10)
-        soup = BeautifulSoup(r.text, "html.parser")
+        r = session.get(page_url, timeout=10)
+        soup = BeautifulSoup(r.content, "lxml")
     except Exception:
         continue
 
@@ -42,7 +44,7 @@ for page in pages:
         href = a["href"]
         rel = a.get("rel", [])
 
-        parsed = urlparse(href)
+        parsed = urlsplit(href)
 
         # Only external links
         if parsed.netloc and parsed.netloc != blog_domain:
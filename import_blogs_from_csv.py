@@ -1,5 +1,7 @@
 import csv
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import mysql.connector
 from urllib.parse import urlparse
 
@@ -12,12 +14,18 @@ DB_CONFIG = {
 
 CSV_FILE = "input_blogs.csv"
 TIMEOUT = 10
+MAX_WORKERS = 16
+
+# Shared by the liveness threads; pool sized to MAX_WORKERS
+session = requests.Session()
+session.headers.update({"User-Agent": "Mozilla/5.0 (BlogLeadCrawler)"})
+_adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
 
 def is_blog_alive(url):
     try:
-        r = requests.get(url, timeout=TIMEOUT, headers={
-            "User-Agent": "Mozilla/5.0 (BlogLeadCrawler)"
-        })
+        r = session.get(url, timeout=TIMEOUT)
         return r.status_code < 400
     except:
         return False
@@ -38,29 +46,41 @@ def main():
 
     with open(CSV_FILE, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
+        urls = [normalize_url(row["blog_url"]) for row in reader]
+
+    candidates = []
+    seen = set()
+    for blog_url in urls:
+        if blog_url in seen:
+            skipped_duplicate += 1
+            continue
+        seen.add(blog_url)
+
+        # Check duplicate
+        cursor.execute(
+            "SELECT id FROM blogs WHERE blog_url = %s",
+            (blog_url,)
+        )
+        if cursor.fetchone():
+            skipped_duplicate += 1
+            continue
+
+        candidates.append(blog_url)
+
+    # Check alive — independent HTTP requests, so run them in parallel
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        alive = list(ex.map(is_blog_alive, candidates))
+
+    for blog_url, ok in zip(candidates, alive):
+        if not ok:
+            skipped_dead += 1
+            continue
 
-        for row in reader:
-            blog_url = normalize_url(row["blog_url"])
-
-            # Check duplicate
-            cursor.execute(
-                "SELECT id FROM blogs WHERE blog_url = %s",
-                (blog_url,)
-            )
-            if cursor.fetchone():
-                skipped_duplicate += 1
-                continue
-
-            # Check alive
-            if not is_blog_alive(blog_url):
-                skipped_dead += 1
-                continue
-
-            cursor.execute(
-                "INSERT INTO blogs (blog_url) VALUES (%s)",
-                (blog_url,)
-            )
-            added += 1
+        cursor.execute(
+            "INSERT INTO blogs (blog_url) VALUES (%s)",
+            (blog_url,)
+        )
+        added += 1
 
     conn.commit()
     cursor.close()
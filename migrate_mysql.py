@@ -0,0 +1,44 @@
+import os
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Replaces add_casino_table.py + add_post_date_column.py:
+# one connection, every step safe to re-run.
+connection = mysql.connector.connect(
+    host=os.getenv("MYSQL_HOST", "localhost"),
+    user=os.getenv("MYSQL_USER", "root"),
+    password=os.getenv("MYSQL_PASSWORD"),
+    database=os.getenv("MYSQL_DATABASE", "blog_lead_crawler"),
+    autocommit=False
+)
+
+cursor = connection.cursor()
+
+# Table: commercial_site_analysis
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS commercial_site_analysis (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    commercial_domain VARCHAR(255) UNIQUE,
+    is_casino BOOLEAN,
+    matched_keywords TEXT,
+    checked_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+""")
+print("✅ Casino analysis table ready")
+
+# Column: blog_pages.post_date (SHOW COLUMNS guard works on any MySQL 8)
+cursor.execute("SHOW COLUMNS FROM blog_pages LIKE 'post_date'")
+if cursor.fetchone():
+    print("✅ post_date column already on blog_pages")
+else:
+    cursor.execute("""
+    ALTER TABLE blog_pages
+    ADD COLUMN post_date DATE NULL
+    """)
+    print("✅ post_date column added to blog_pages")
+
+connection.commit()
+cursor.close()
+connection.close()
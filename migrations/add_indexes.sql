@@ -0,0 +1,22 @@
+-- Postgres indexes for the crawler / API hot queries.
+-- CONCURRENTLY cannot run inside a transaction block: run with plain psql,
+--   psql "$DATABASE_URL" -f migrations/add_indexes.sql
+-- Every statement is IF NOT EXISTS, so the file is safe to re-run.
+
+-- crawler_worker_single(): next pending root blog, oldest first.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS blog_pages_pending_root_idx
+    ON blog_pages (first_crawled)
+    WHERE is_root = TRUE AND crawl_status = 'pending';
+
+-- /history: last 30 days, newest first.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS blog_pages_first_crawled_idx
+    ON blog_pages (first_crawled DESC);
+
+-- Per-page link lookups / joins from blog_pages.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS outbound_links_page_idx
+    ON outbound_links (blog_page_id);
+
+-- crawler/casino_worker.py: domains not yet enriched.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS commercial_sites_unenriched_idx
+    ON commercial_sites (commercial_domain)
+    WHERE meta_title IS NULL;
@@ -3,7 +3,7 @@ from datetime import datetime
 import re
 
 def extract_post_date(html):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
 
     # 1. <time datetime="2024-06-12">
     time_tag = soup.find("time")
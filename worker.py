@@ -1,5 +1,10 @@
-from api import crawler_worker
+import os
+
+# worker.py starts the threads itself; importing api must not start another set
+os.environ["RUN_WORKER"] = "false"
+
+from api import start_crawler_workers
 
 print("### BLOG LEAD CRAWLER WORKER — STANDALONE MODE ###")
 
-crawler_worker()
+start_crawler_workers()